@@ -1,9 +1,16 @@
+# For numpy arrays
+import numpy
+
 # Base router class
 from router import Router
 
 # Class representing distance vector routers
 class DVRouter(Router):
-    def __init__(self, router_id, clock):
+    __slots__ = ("dv_change", "dv", "dv_version", "_seen_versions")
+
+    # Router IDs are dense integers 0..num_routers - 1, so the distance vector is stored as an array indexed by ID.
+    # If num_routers isn't known up front, the array grows as larger router IDs are seen.
+    def __init__(self, router_id, clock, num_routers=0):
         # Common initialization routines
         Router.__init__(self, router_id, clock)
 
@@ -12,66 +19,82 @@ class DVRouter(Router):
 
         # The distance vector at each node.
         # self.dv[dst] gives the current best distance to dst
-        # If dst is absent in self.dv, it's equivalent to a distance of infinity.
-        # Hence, we don't need to explicitly store distances of infinity.
-        self.dv = dict()
+        # A distance of infinity means dst hasn't been reached yet,
+        # as does dst being past the end of self.dv.
+        self.dv = numpy.full(num_routers, numpy.inf)
+
+        # Version of self.dv, bumped every time its contents change,
+        # and the last version processed from each neighbor.
+        # Reprocessing an already seen version can't improve self.dv, so we skip it.
+        self.dv_version = 0
+        self._seen_versions = dict()
+
+    # Populate self.links, forgetting seen versions since link costs may have changed
+    def add_links(self, links):
+        Router.add_links(self, links)
+        self._seen_versions.clear()
+
+    # Grow self.dv to hold at least size routers, filling new entries with infinity
+    def grow_dv(self, size):
+        if size > len(self.dv):
+            grown = numpy.full(size, numpy.inf)
+            grown[: len(self.dv)] = self.dv
+            self.dv = grown
 
     # Initialize DV at boot up
     def initialize_algorithm(self):
+        self.grow_dv(max(list(self.links) + [self.router_id]) + 1)
+
         # Distance vector to all neighbors of this router
-        for neighbor_id in self.links:
-            self.dv[neighbor_id] = self.links[neighbor_id]
+        for neighbor_id, cost in self.links.items():
+            self.dv[neighbor_id] = cost
             self.fwd_table[neighbor_id] = neighbor_id
 
         # Distance vector to this router itself
         self.dv[self.router_id] = 0
         self.fwd_table[self.router_id] = self.router_id
+        self.dv_version += 1
 
     def run_one_tick(self):
         # If the DV changes, advertise it to every neighbor.
         # Reset the DV back to False at the end.
+        # Every neighbor gets the same read-only snapshot of the DV,
+        # so an advertisement can't change under a receiver once it has been sent.
         if self.dv_change:
+            snapshot = self.dv.copy()
+            snapshot.flags.writeable = False
             for neighbor in self.neighbors:
-                self.send(neighbor, self.dv, self.router_id)
+                self.send(neighbor, snapshot, self.router_id, self.dv_version)
         self.dv_change = False
 
-    def send(self, neighbor, dv_adv, adv_router):
-        neighbor.process_advertisement(dv_adv, adv_router)
+    def send(self, neighbor, dv_adv, adv_router, version):
+        neighbor.process_advertisement(dv_adv, adv_router, version)
 
     # The core logic of the algorithm goes in the process_advertisement method.
-    # This method takes two arguments:
+    # This method takes three arguments:
     # (1) the distance vector advertisement that it is receiving (dv_adv)
-    # (2) and the router that is advertising this distance vector (adv_router)
-    def process_advertisement(self, dv_adv, adv_router):
-        # TODO: Implement this using the instructions below.
-        # (1) Iterate through all destinations in this router's distance vector (self.dv).
-        
-
-        for dest in self.dv.keys():
-        # If this destination is also in the dv_adv that you just received,
-        # check if you can find a better path to the destination through adv_router
-            if dest in dv_adv.keys():
-                new_cost = self.links[adv_router] + dv_adv[dest]
-                if new_cost < self.dv[dest]:
-                    self.dv[dest] = new_cost
-                    self.fwd_table[dest] = adv_router
-                    self.dv_change = True
-
-
-
-        # (2) Iterate through all destinations in the just received distance vector (dv_adv),
-        # which are not in this router's current distance vector (self.dv)
-        # , i.e., this router's current distance to them is infinity.
-        # For such destinations, you should update the distance vector and next hop information
-        # to use adv_router because the current distance is infinity.
-        for dest in dv_adv.keys():
-            if not dest in self.dv.keys():
-                self.dv[dest] = self.links[adv_router] + dv_adv[dest]
-                self.fwd_table[dest] = adv_router
-                self.dv_change = True
-
-        
-        # (3) Make sure you update self.fwd_table[dst] to reflect the current best choice
-        # of next hop to destination dst. simulator.py uses this to check your implementation.
+    # (2) the router that is advertising this distance vector (adv_router)
+    # (3) and the advertising router's dv_version (version), letting us skip a version we have already processed.
+    def process_advertisement(self, dv_adv, adv_router, version):
+        # Skip advertisements whose version was already processed from adv_router
+        if self._seen_versions.get(adv_router) == version:
+            return
+        self._seen_versions[adv_router] = version
 
-        pass
+        # For every destination at once, check if going through adv_router is cheaper.
+        # This covers destinations whose current distance is infinity, for which going through adv_router
+        # is always an improvement unless adv_router can't reach them either.
+        self.grow_dv(len(dv_adv))
+        dv = self.dv[: len(dv_adv)]
+        link_cost = self.links[adv_router]
+        new_costs = link_cost + dv_adv
+        better = new_costs < dv
+        if better.any():
+            dv[better] = new_costs[better]
+            # Make sure self.fwd_table[dest] reflects adv_router as the new best next hop,
+            # since simulator.py uses the forwarding table to check this implementation.
+            fwd = self.fwd_table
+            for dest in numpy.flatnonzero(better).tolist():
+                fwd[dest] = adv_router
+            self.dv_change = True
+            self.dv_version += 1
@@ -1,72 +1,144 @@
+# Priority queue for Dijkstra's algorithm
+from heapq import heappush, heappop
+
 # Base router class
 from router import Router
 
 # This is long enough so that broadcasts complete even on large topologies
 BROADCAST_INTERVAL = 1000
 
+# Number of consecutive ticks without a new LSA before the broadcast may be declared complete early
+QUIESCENT_TICKS = 2
+
 
 # Class representing link state routers
 class LSRouter(Router):
+    __slots__ = (
+        "broadcast_complete",
+        "routes_computed",
+        "lsa_dict",
+        "pending_lsas",
+        "_last_lsa_count",
+        "_stable_ticks",
+        "known_by_neighbor",
+        "_lsa_dirty",
+    )
+
     def __init__(self, router_id, clock):
         # Common initialization routines
         Router.__init__(self, router_id, clock)
 
         # Is the broadcast complete? => Can we run Dijkstra's algorithm?
-        # For now, we'll use a simple heuristic for this:
-        # If BROADCAST_INTERVAL since the first link state advertisement (LSA) at time 0,
+        # We declare the broadcast complete early once no new LSA has arrived for QUIESCENT_TICKS ticks
+        # and every router named in a known LSA has sent its own LSA.
+        # As a fallback, if BROADCAST_INTERVAL since the first link state advertisement (LSA) at time 0,
         # we'll declare the broadcast complete
         self.broadcast_complete = False
 
         # Have you run Dijkstra's algorithm? This is to ensure you don't repeatedly run it.
+        # Only dijkstras_algorithm sets this; reset it to False to force routes to be recomputed.
         self.routes_computed = False
 
         # LSA dictionary mapping from a router ID to the links for that router.
         # We'll initialize lsa_dict to  this router's own links.
         self.lsa_dict = dict()
 
-        # For each LSA received from a distinct router,
-        # maintain if it has been broadcasted or not.
-        # This is to avoid repeated broadcasts of the same LSA
-        # We'll initialize self.broadcasted to reflect the fact that this router's own links
-        # have not yet been broadcasted as of time 0.
-        self.broadcasted = {self.router_id: False}
+        # Set of router IDs whose LSAs have been received but not yet broadcasted.
+        # This is to avoid repeated broadcasts of the same LSA:
+        # an LSA is only queued here the first time it arrives, and run_one_tick drains the set every tick,
+        # so it only walks new LSAs instead of the whole lsa_dict.
+        self.pending_lsas = set()
+
+        # Number of LSAs seen as of the previous tick,
+        # and how many consecutive ticks have passed without a new LSA
+        self._last_lsa_count = 0
+        self._stable_ticks = 0
+
+        # Maps a neighbor's router ID to the set of routers whose LSAs that neighbor is known to have,
+        # either because it advertised them to us or because we already advertised them to it.
+        # We never advertise an LSA to a neighbor that is known to have it.
+        self.known_by_neighbor = dict()
+
+        # Has lsa_dict gained or changed an entry since the last run of Dijkstra's algorithm?
+        # If not, rerunning it would produce the same routes, so the current fwd_table is kept.
+        self._lsa_dirty = True
 
     # Initialize link state to this router's own links alone
     def initialize_algorithm(self):
         self.lsa_dict = {self.router_id: self.links}
+        self._lsa_dirty = True
+        self.pending_lsas.add(self.router_id)
 
     def run_one_tick(self):
         if self.clock.read_tick() >= BROADCAST_INTERVAL and not self.routes_computed:
             # If broadcast phase is over, compute routes and return
             self.broadcast_complete = True
             self.dijkstras_algorithm()
-            self.routes_computed = True
             return
-        elif self.clock.read_tick() < BROADCAST_INTERVAL:
+        elif self.clock.read_tick() < BROADCAST_INTERVAL and not self.broadcast_complete:
             # TODO: Go through the LSAs received so far.
             # broadcast each LSA to this router's neighbors if the LSA has not been broadcasted yet
 
-            #lsa_dict is a table of router IDs mapping to advertisements
-            for router, ad in self.lsa_dict.items():
-                # If we have not broadcasted or we are looking at a router who's ad has not been broadcasted,
-                # then we broadcast the ad and the router it came from
-                if not router in self.broadcasted.keys() or self.broadcasted[router] == False:
-                    # broadcast each previously unbroadcasted ad to all neighbors
-                    for neighbor in self.neighbors:
-                        self.send(neighbor, ad, router)
-                    # after sending to all neighbors, mark that ad as broadcasted
-                    self.broadcasted[router] = True
-            
-            pass
+            # pending_lsas holds the routers whose ads have not been broadcasted yet,
+            # so we broadcast each of those ads and the router it came from to all neighbors,
+            # handing each neighbor all of them at once
+            pending = self.pending_lsas
+            for neighbor in self.neighbors:
+                self.advertise(neighbor, ((router, self.lsa_dict[router]) for router in pending))
+            # after sending to all neighbors, those ads have been broadcasted
+            pending.clear()
+
+            # Track how long the LSA database has been stable
+            if len(self.lsa_dict) == self._last_lsa_count:
+                self._stable_ticks += 1
+            else:
+                self._stable_ticks = 0
+            self._last_lsa_count = len(self.lsa_dict)
+
+            # If nothing new has arrived for a while and the topology is complete,
+            # there is nothing left to broadcast, so compute routes without waiting for BROADCAST_INTERVAL
+            if self._stable_ticks >= QUIESCENT_TICKS and self.lsa_dict_complete():
+                self.broadcast_complete = True
+                self.dijkstras_algorithm()
         else:
             return
 
+    # The LSA database is complete once every router that appears as a neighbor in a known LSA
+    # has its own LSA in lsa_dict. Since the network is connected, any missing router would
+    # be a neighbor of some router we already know about.
+    def lsa_dict_complete(self):
+        for links in self.lsa_dict.values():
+            for neighbor_id in links:
+                if neighbor_id not in self.lsa_dict:
+                    return False
+        return True
+
     # Note that adv_router is the router that generated this advertisement,
     # which may be different from "self",
     # the router that is broadcasting this advertisement by sending it to a neighbor of self.
     def send(self, neighbor, ls_adv, adv_router):
-        neighbor.lsa_dict[adv_router] = ls_adv
-        # It's OK to reinitialize this even if adv_router even if adv_router is in lsa_dict
+        self.advertise(neighbor, [(adv_router, ls_adv)])
+
+    # Flood (adv_router, ls_adv) pairs to neighbor.
+    # Flooding is two-phase: we first advertise just the ID of adv_router,
+    # and only send the LSA itself if the neighbor demands it because it doesn't have it yet.
+    # The per-neighbor state is looked up once per call rather than once per LSA,
+    # since run_one_tick hands over every pending LSA in a single call.
+    def advertise(self, neighbor, ads):
+        known = self.known_by_neighbor.setdefault(neighbor.router_id, set())
+        # the neighbor learns that we have each LSA we advertise
+        known_by_neighbor = neighbor.known_by_neighbor.setdefault(self.router_id, set())
+        for adv_router, ls_adv in ads:
+            if adv_router in known:
+                continue
+            known.add(adv_router)
+            known_by_neighbor.add(adv_router)
+            # The neighbor demands the LSA only if it doesn't have it yet
+            if adv_router not in neighbor.lsa_dict:
+                neighbor.lsa_dict[adv_router] = ls_adv
+                neighbor._lsa_dirty = True
+                # Queue the LSA for broadcast at the neighbor
+                neighbor.pending_lsas.add(adv_router)
 
     def dijkstras_algorithm(self):
         # TODO:
@@ -75,74 +147,77 @@ class LSRouter(Router):
         # Feel free to use a different shortest path algo. if you're more comfortable with it.
         # (2) Remember to populate self.fwd_table with the next hop for every destination
         # because simulator.py uses this to check your LS implementation.
-        # (3) If it helps, you can use the helper function next_hop below to compute the next hop once you
-        # have populated the prev dictionary which maps a destination to the penultimate hop
-        # on the shortest path to this destination from this router.
-
-        # initialize set of not visited routers with all routers in lsa_dict because we haven't started,
-        # so none are visited yet
-        not_visited = set(self.lsa_dict.keys())
-
-        # initialize distances as infinity (for min comparisons)
-        # initialize prev as -1 for all routers to show that none are connected as part of the shortest path yet
-        distances = {}
-        prev = {} 
-        for router in self.lsa_dict.keys():
-            distances[router] = float('inf')
-            prev[router] = -1
-        # initialize distance to self as 0
-        distances[self.router_id] = 0
-
-
-        # Dijkstra's algorithm iterates until not_visited is empty, 
-        # in other words until all routers have been visited
-        while not_visited:
-            # Find the router with the minimum distance
-            min_distance = float('inf')
-            min_router = None
-
-            # Initially this will be self because all others are infinity, 
-            # next round will be min edge from self to one of its neighbors, etc.
-            for router in not_visited:
-                if distances[router] < min_distance:
-                    min_distance = distances[router]
-                    min_router = router
-            
-
-            
-            # mark the minimum distance router as visited
-            not_visited.remove(min_router)
-            
-            # update distances to neighbors of min_router by checking if going through min_router is shorter
-            for neighbor, cost in self.lsa_dict[min_router].items():
-                if neighbor in not_visited:
-                    # new distance to router x is distance to min router + distance from min router to router x
-                    new_distance = distances[min_router] + cost
-                    # only update with new distance if it less than old distance
-                    if new_distance < distances[neighbor]:
-                        distances[neighbor] = new_distance
-                        prev[neighbor] = min_router
-        
-        # populate forwarding table using prev dictionary 
-        # and the recursive next_hop function
-        for router in self.lsa_dict.keys():
-            if router != self.router_id and prev[router] != -1:
-                next_hop_router = self.next_hop(router, prev)
-                self.fwd_table[router] = next_hop_router
+        # (3) Rather than walking the prev dictionary back from every destination,
+        # we propagate the first hop from this router down the shortest path tree as we relax edges.
+
+        # Routes are already up to date
+        if self.routes_computed:
+            return
+
+        # The current forwarding table is still valid if the link state hasn't changed since the last run
+        if not self._lsa_dirty:
+            self.routes_computed = True
+            return
+
+        # first_hop maps every reachable router to the first hop on the shortest path to it from this router
+        first_hop = self.heap_first_hops()
+
+        # populate forwarding table using the first hop of every reachable router
+        # (this router itself never has a first hop).
+        # The table is rebuilt from scratch so routers that are no longer reachable drop out of it.
+        self.fwd_table = {}
+        for router in self.lsa_dict:
+            hop = first_hop.get(router)
+            if hop is not None:
+                self.fwd_table[router] = hop
+
+        # The forwarding table now reflects the current link state
+        self._lsa_dirty = False
 
         # set routes_computed as True after visiting all routers and updating forwarding table for all routers
         self.routes_computed = True
 
-        pass
-
-    # Recursive function for computing next hops using the prev dictionary
-    def next_hop(self, dst, prev):
-        # Can't find next_hop if dst is disconnected from self.router_id
-        assert prev[dst] != -1
-        # Nor if dst and self.router_id are the same
-        assert self.router_id != dst
-        if prev[dst] == self.router_id:
-            # base case, src and dst are directly connected
-            return dst
-        else:
-            return self.next_hop(prev[dst], prev)
+    # Dijkstra's algorithm using a binary heap as the priority queue, O((V+E) log V).
+    # Returns a dictionary mapping each reachable router to its first hop from this router.
+    def heap_first_hops(self):
+        # visited holds routers whose shortest distance is final.
+        # pq is a min-heap of (distance, router) entries, starting with self at distance 0
+        visited = set()
+        pq = [(0, self.router_id)]
+
+        # distances are filled in lazily: a router absent from distances is at distance infinity.
+        # first_hop maps a router to the first hop on the shortest path to it from this router;
+        # a router absent from first_hop isn't connected as part of the shortest path yet
+        distances = {self.router_id: 0}
+        first_hop = {}
+        inf = float('inf')
+
+        # Dijkstra's algorithm iterates until the priority queue is empty.
+        # We don't decrease keys in the heap; instead we push a new entry on every
+        # relaxation and skip stale entries for routers that have already been visited.
+        while pq:
+            # pop the unvisited router with the minimum distance
+            distance, min_router = heappop(pq)
+            if min_router in visited:
+                continue
+
+            # mark the minimum distance router as visited
+            visited.add(min_router)
+
+            # update distances to neighbors of min_router by checking if going through min_router is shorter
+            # (a router whose LSA hasn't arrived yet has no known links)
+            for neighbor, cost in self.lsa_dict.get(min_router, {}).items():
+                # new distance to router x is distance to min router + distance from min router to router x
+                new_distance = distance + cost
+                # only update with new distance if it less than old distance
+                if new_distance < distances.get(neighbor, inf):
+                    distances[neighbor] = new_distance
+                    # a neighbor reached directly from self is its own first hop,
+                    # otherwise it inherits min_router's first hop
+                    if min_router == self.router_id:
+                        first_hop[neighbor] = neighbor
+                    else:
+                        first_hop[neighbor] = first_hop[min_router]
+                    heappush(pq, (new_distance, neighbor))
+
+        return first_hop
@@ -1,4 +1,9 @@
 class Router:
+    # Routers are created once per node and their attributes are read in every tick,
+    # so use __slots__ rather than a per-instance __dict__.
+    # Subclasses list the attributes they add in their own __slots__.
+    __slots__ = ("neighbors", "links", "router_id", "clock", "fwd_table")
+
     def __init__(self, router_id, clock):
         # List holding references to all neighbor router objects
         # This is required to send advertisements to the neighbor router objects
@@ -38,10 +38,15 @@ def compute_shortest_path(src, dst, preds):
     assert preds[src][dst] != -9999
     assert src != dst
 
-    if preds[src][dst] == src:
-        return []  # base case, src and dst are directly connected
-    else:
-        return compute_shortest_path(src, preds[src][dst], preds) + [preds[src][dst]]
+    # Walk back from dst to src one predecessor at a time, collecting the intermediate routers.
+    # This is iterative so that long paths don't run into the recursion limit.
+    path = []
+    hop = preds[src][dst]
+    while hop != src:
+        path.append(hop)
+        hop = preds[src][hop]
+    path.reverse()
+    return path
 
 
 # check routing algorithm is either DV or LS
@@ -131,7 +136,7 @@ def get_routers(rt_algo, num_nodes, test_graph, clock):
     routers = []
     for i in range(0, num_nodes):
         if rt_algo == "DV":
-            routers.append(DVRouter(i, clock))
+            routers.append(DVRouter(i, clock, num_nodes))
         elif rt_algo == "LS":
             routers.append(LSRouter(i, clock))
         else: